@@ -0,0 +1,101 @@
+"""
+Numba-compiled numeric kernels for the prediction API and training.
+Kept separate from api.py so the compiled cache can be shared across workers.
+"""
+
+import numpy as np
+from numba import njit
+
+# float32 constants keep the kernel's accumulation in single precision
+_F32_ZERO = np.float32(0.0)
+_FALLBACK_WEIGHT = np.float32(0.25)  # 0.5^2
+
+# The closeness test stays float64: one-decimal AFs such as 0.4 vs 0.1 are
+# just over 0.3 apart in float64 but exactly 0.3 apart in float32
+_AF_RANGE = 0.3
+
+# Explicit signature: compiled (or loaded from cache) at import, so no request
+# pays JIT latency and callers can't trigger a second specialization
+@njit('float64(float64[::1], float32[::1], float64)', cache=True, fastmath=True, boundscheck=False)
+def _heuristic_kernel(af_arr: np.ndarray, score_arr: np.ndarray, user_af: float) -> float:
+    """
+    Personality-weighted average of similar users' scores in a single pass.
+    
+    Ratings within 0.3 AF of the user are weighted by (1 - distance / 0.3)^2.
+    If no rating is that close, every rating gets the same 0.5^2 weight.
+    AF distances are compared in float64; weights and scores accumulate
+    in float32.
+    
+    Returns:
+        Predicted score clipped to 1-10, or NaN if the total weight is zero
+        (no ratings, or every close rating sits exactly 0.3 away)
+    """
+    n = af_arr.shape[0]
+    weighted_sum = _F32_ZERO
+    total_weight = _F32_ZERO
+    n_close = 0
+    score_sum = _F32_ZERO
+    
+    # Branch-free loop body (mask multiply instead of if) so LLVM can vectorize it
+    for i in range(n):
+        dist = abs(af_arr[i] - user_af)
+        close = dist <= _AF_RANGE
+        sim = 1.0 - dist / _AF_RANGE
+        w = np.float32(sim * sim) * np.float32(close)  # Square for emphasis, zero outside the AF range
+        weighted_sum += w * score_arr[i]
+        total_weight += w
+        score_sum += score_arr[i]
+        n_close += close
+    
+    if n_close == 0:
+        # Use all ratings if no similar users
+        weighted_sum = _FALLBACK_WEIGHT * score_sum
+        total_weight = _FALLBACK_WEIGHT * np.float32(n)
+    
+    if total_weight == _F32_ZERO:
+        return np.nan
+    
+    predicted_score = weighted_sum / total_weight
+    if predicted_score < 1.0:
+        return 1.0
+    if predicted_score > 10.0:
+        return 10.0
+    return predicted_score
+
+@njit(cache=True)
+def _aggregate_ratings(
+    user_idx: np.ndarray,
+    place_idx: np.ndarray,
+    scores: np.ndarray,
+    cats: np.ndarray,
+    n_users: int,
+    n_places: int
+):
+    """
+    Per-user and per-place rating sums in a single pass.
+    
+    user_idx/place_idx are dense 0-based indices, one per rating; cats is
+    (n_ratings, n_categories). Serial on purpose: the scatter-adds would race
+    under prange, and training sets are far too small to amortize threads.
+    
+    Returns:
+        Tuple of (user_count, user_sum, place_count, place_sum, cat_sums)
+    """
+    n_cats = cats.shape[1]
+    user_count = np.zeros(n_users, dtype=np.int64)
+    user_sum = np.zeros(n_users, dtype=np.float64)
+    place_count = np.zeros(n_places, dtype=np.int64)
+    place_sum = np.zeros(n_places, dtype=np.float64)
+    cat_sums = np.zeros((n_places, n_cats), dtype=np.float64)
+    
+    for i in range(scores.shape[0]):
+        u = user_idx[i]
+        p = place_idx[i]
+        user_count[u] += 1
+        user_sum[u] += scores[i]
+        place_count[p] += 1
+        place_sum[p] += scores[i]
+        for j in range(n_cats):
+            cat_sums[p, j] += cats[i, j]
+    
+    return user_count, user_sum, place_count, place_sum, cat_sums
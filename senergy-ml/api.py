@@ -3,129 +3,210 @@ Flask API for ML-powered recommendations.
 Provides a prediction endpoint that combines heuristic + ML predictions.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
 import os
-from typing import Dict, List
+from operator import attrgetter
+import orjson
+from pydantic import ValidationError
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 from model import SenergyRecommendationModel
+from _kernels import _heuristic_kernel
+from schemas import (
+    BatchPredictRequest,
+    HeuristicBreakdown,
+    MLBreakdown,
+    PredictionBreakdown,
+    PredictionResult,
+    PredictRequest,
+    SimilarUserRating
+)
 
 app = Flask(__name__)
 CORS(app)
 
+class ORJSONResponse(Response):
+    """Response whose body has already been serialized with orjson."""
+    default_mimetype = 'application/json'
+
+def json_response(payload: Dict, status: int = 200) -> ORJSONResponse:
+    """Serialize a payload with orjson (NumPy values allowed) into a JSON response."""
+    return ORJSONResponse(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status
+    )
+
+def validation_error_response(e: ValidationError) -> ORJSONResponse:
+    """400 response describing why a request body failed schema validation."""
+    errors = e.errors()
+    missing = [
+        '.'.join(str(part) for part in err['loc'])
+        for err in errors if err['type'] == 'missing'
+    ]
+    if missing:
+        error = f'Missing required fields: {", ".join(missing)}'
+    else:
+        error = 'Invalid request: ' + '; '.join(
+            f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+            for err in errors
+        )
+    
+    return json_response({
+        'success': False,
+        'error': error
+    }, 400)
+
 # Initialize model (will load existing model)
 model = SenergyRecommendationModel(model_dir='models')
 try:
-    model.load()
+    model.load(inference_only=True)
     print("✅ ML model loaded successfully!")
 except Exception as e:
     print(f"⚠️  No trained model found: {e}")
     print("   Run train.py to train the model first")
 
+# Warm the traced forward pass so the first request doesn't pay trace/compile cost
+if model.is_ready:
+    try:
+        model.predict('', '', {}, {})
+    except Exception as e:
+        print(f"⚠️  Model warm-up failed: {e}")
+
+_rating_fields = attrgetter('userAdjustmentFactor', 'overallScore')
+
+def _to_arrays(ratings: List[SimilarUserRating]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert similar-user ratings into parallel (adjustment factor, score) arrays.
+    """
+    if not ratings:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float32)
+    
+    pairs = np.array([_rating_fields(r) for r in ratings], dtype=np.float64)
+    
+    # AFs stay float64 so the kernel's 0.3 closeness test matches exactly;
+    # scores are float32, which is plenty for outputs rounded to 2dp
+    af = np.ascontiguousarray(pairs[:, 0])
+    score = pairs[:, 1].astype(np.float32)
+    return af, score
+
 def heuristic_prediction(
     user_features: Dict,
     place_features: Dict,
-    similar_users_ratings: List[Dict]
+    similar_ratings: Tuple[np.ndarray, np.ndarray]
 ) -> float:
     """
     Original heuristic-based prediction algorithm.
     Uses collaborative filtering with personality similarity.
+    
+    similar_ratings is the (adjustment factor, score) array pair built by _to_arrays.
     """
     user_af = user_features.get('adjustmentFactor', 0)
+    af, score = similar_ratings
     
-    if not similar_users_ratings:
+    if af.size == 0:
         # No similar users - use global average
         return place_features.get('avgScore', 5.0)
     
-    # Find ratings from users with similar personality (within 0.3 AF range)
-    similar_ratings = [
-        r for r in similar_users_ratings
-        if abs(r.get('userAdjustmentFactor', 0) - user_af) <= 0.3
-    ]
-    
-    if not similar_ratings:
-        # Use all ratings if no similar users
-        similar_ratings = similar_users_ratings
-    
-    # Calculate weighted average based on personality similarity
-    weighted_sum = 0
-    total_weight = 0
-    
-    for rating in similar_ratings:
-        af_distance = abs(rating.get('userAdjustmentFactor', 0) - user_af)
-        similarity = 1 - (af_distance / 0.3) if af_distance <= 0.3 else 0.5
-        weight = similarity * similarity  # Square for emphasis
-        
-        weighted_sum += rating['overallScore'] * weight
-        total_weight += weight
+    predicted_score = _heuristic_kernel(af, score, float(user_af))
     
-    if total_weight == 0:
+    if np.isnan(predicted_score):
+        # Zero total weight - fall back to global average
         return place_features.get('avgScore', 5.0)
     
-    predicted_score = weighted_sum / total_weight
-    return max(1.0, min(10.0, predicted_score))
+    return predicted_score
 
-def hybrid_prediction(
+def ml_prediction(
     user_id: str,
     place_id: str,
     user_features: Dict,
-    place_features: Dict,
-    similar_users_ratings: List[Dict],
-    heuristic_weight: float = 0.7,
-    ml_weight: float = 0.3
-) -> Dict:
+    place_features: Dict
+) -> Tuple[Optional[float], float]:
     """
-    Combine heuristic and ML predictions with weighted average.
+    Get the ML prediction for a user-place pair if the model is available.
     
-    Args:
-        user_id: User ID
-        place_id: Place ID
-        user_features: User feature dictionary
-        place_features: Place feature dictionary
-        similar_users_ratings: List of ratings from similar users
-        heuristic_weight: Weight for heuristic prediction (default 0.7)
-        ml_weight: Weight for ML prediction (default 0.3)
-        
     Returns:
-        Dictionary with predictions and confidence metrics
+        Tuple of (ml_score or None if unavailable, ml_confidence)
     """
-    # Get heuristic prediction
-    heuristic_score = heuristic_prediction(
-        user_features,
-        place_features,
-        similar_users_ratings
-    )
+    if not model.is_ready:
+        return None, 0.0
     
-    # Calculate heuristic confidence based on data availability
-    n_similar = len(similar_users_ratings)
-    heuristic_confidence = min(n_similar / 10, 1.0) if n_similar > 0 else 0.3
+    try:
+        ml_score = model.predict(
+            user_id,
+            place_id,
+            user_features,
+            place_features
+        )
+    except Exception as e:
+        print(f"⚠️  ML prediction failed: {e}")
+        return None, 0.0
     
-    # Get ML prediction if model is available
-    ml_score = None
-    ml_confidence = 0.0
+    return ml_score, ml_confidence_for(user_id, place_id)
+
+def batch_ml_prediction(
+    user_ids: List[str],
+    place_ids: List[str],
+    user_features_list: List[Dict],
+    place_features_list: List[Dict]
+) -> Tuple[List[Optional[float]], List[float]]:
+    """
+    Get ML predictions for many user-place pairs with a single forward pass.
     
-    if model.interaction_model is not None:
-        try:
-            ml_score = model.predict(
-                user_id,
-                place_id,
-                user_features,
-                place_features
-            )
-            
-            # ML confidence based on whether user/place are in training set
-            user_known = user_id in model.user_id_map
-            place_known = place_id in model.place_id_map
-            
-            if user_known and place_known:
-                ml_confidence = 0.9
-            elif user_known or place_known:
-                ml_confidence = 0.6
-            else:
-                ml_confidence = 0.3  # Cold start
-                
-        except Exception as e:
-            print(f"⚠️  ML prediction failed: {e}")
-            ml_score = None
+    Returns:
+        Tuple of (ml_scores, ml_confidences), aligned with the inputs
+    """
+    n = len(user_ids)
+    
+    if not model.is_ready:
+        return [None] * n, [0.0] * n
+    
+    try:
+        ml_scores = model.predict_batch(
+            user_ids,
+            place_ids,
+            user_features_list,
+            place_features_list
+        ).tolist()
+    except Exception as e:
+        print(f"⚠️  Batch ML prediction failed: {e}")
+        return [None] * n, [0.0] * n
+    
+    ml_confidences = [
+        ml_confidence_for(user_id, place_id)
+        for user_id, place_id in zip(user_ids, place_ids)
+    ]
+    
+    return ml_scores, ml_confidences
+
+def ml_confidence_for(user_id: str, place_id: str) -> float:
+    """ML confidence based on whether user/place are in training set."""
+    user_known = user_id in model.user_id_set
+    place_known = place_id in model.place_id_set
+    
+    if user_known and place_known:
+        return 0.9
+    elif user_known or place_known:
+        return 0.6
+    else:
+        return 0.3  # Cold start
+
+def combine_predictions(
+    heuristic_score: float,
+    n_similar: int,
+    ml_score: Optional[float],
+    ml_confidence: float,
+    heuristic_weight: float,
+    ml_weight: float
+) -> PredictionResult:
+    """
+    Build the prediction response from the heuristic and (optional) ML results.
+    """
+    # Calculate heuristic confidence based on data availability
+    if n_similar == 0:
+        heuristic_confidence = 0.3
+    else:
+        heuristic_confidence = n_similar / 10 if n_similar < 10 else 1.0
     
     # Combine predictions
     if ml_score is not None:
@@ -148,32 +229,132 @@ def hybrid_prediction(
         final_confidence = heuristic_confidence
         method = "heuristic_only"
     
-    return {
-        'predictedScore': round(final_score, 2),
-        'confidence': round(final_confidence, 2),
-        'method': method,
-        'breakdown': {
-            'heuristic': {
-                'score': round(heuristic_score, 2),
-                'confidence': round(heuristic_confidence, 2),
-                'weight': heuristic_weight,
-                'n_similar_users': len(similar_users_ratings)
-            },
-            'ml': {
-                'score': round(ml_score, 2) if ml_score is not None else None,
-                'confidence': round(ml_confidence, 2) if ml_score is not None else None,
-                'weight': ml_weight,
-                'available': ml_score is not None
-            }
-        }
-    }
+    ml_available = ml_score is not None
+    
+    # Round every reported value in one vectorized call
+    (
+        final_score,
+        final_confidence,
+        heuristic_score,
+        heuristic_confidence,
+        ml_score,
+        ml_confidence
+    ) = np.array([
+        final_score,
+        final_confidence,
+        heuristic_score,
+        heuristic_confidence,
+        ml_score if ml_available else np.nan,
+        ml_confidence if ml_available else np.nan
+    ]).round(2).tolist()
+    
+    return PredictionResult(
+        predictedScore=final_score,
+        confidence=final_confidence,
+        method=method,
+        breakdown=PredictionBreakdown(
+            heuristic=HeuristicBreakdown(
+                score=heuristic_score,
+                confidence=heuristic_confidence,
+                weight=heuristic_weight,
+                n_similar_users=n_similar
+            ),
+            ml=MLBreakdown(
+                score=ml_score if ml_available else None,
+                confidence=ml_confidence if ml_available else None,
+                weight=ml_weight,
+                available=ml_available
+            )
+        )
+    )
+
+def _hybrid_with_ml(
+    user_id: str,
+    place_id: str,
+    user_features: Dict,
+    place_features: Dict,
+    similar_ratings: Tuple[np.ndarray, np.ndarray],
+    heuristic_weight: float = 0.7,
+    ml_weight: float = 0.3
+) -> PredictionResult:
+    """
+    Combine heuristic and ML predictions with weighted average.
+    
+    Args:
+        user_id: User ID
+        place_id: Place ID
+        user_features: User feature dictionary
+        place_features: Place feature dictionary
+        similar_ratings: (adjustment factor, score) arrays of similar users' ratings
+        heuristic_weight: Weight for heuristic prediction (default 0.7)
+        ml_weight: Weight for ML prediction (default 0.3)
+        
+    Returns:
+        PredictionResult with predictions and confidence metrics
+    """
+    # Get heuristic prediction
+    heuristic_score = heuristic_prediction(
+        user_features,
+        place_features,
+        similar_ratings
+    )
+    
+    # Get ML prediction
+    ml_score, ml_confidence = ml_prediction(
+        user_id,
+        place_id,
+        user_features,
+        place_features
+    )
+    
+    return combine_predictions(
+        heuristic_score,
+        similar_ratings[0].size,
+        ml_score,
+        ml_confidence,
+        heuristic_weight,
+        ml_weight
+    )
+
+def _hybrid_heuristic_only(
+    user_id: str,
+    place_id: str,
+    user_features: Dict,
+    place_features: Dict,
+    similar_ratings: Tuple[np.ndarray, np.ndarray],
+    heuristic_weight: float = 0.7,
+    ml_weight: float = 0.3
+) -> PredictionResult:
+    """
+    Same interface as _hybrid_with_ml, used when no ML model is loaded.
+    Skips the ML path entirely; the response keeps the same shape.
+    """
+    heuristic_score = heuristic_prediction(
+        user_features,
+        place_features,
+        similar_ratings
+    )
+    
+    return combine_predictions(
+        heuristic_score,
+        similar_ratings[0].size,
+        None,
+        0.0,
+        heuristic_weight,
+        ml_weight
+    )
+
+# The model is loaded once at import, so pick the prediction path once too
+hybrid_prediction = (
+    _hybrid_with_ml if model.is_ready else _hybrid_heuristic_only
+)
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
-        'model_loaded': model.interaction_model is not None,
+        'model_loaded': model.is_ready,
         'model_stats': {
             'total_samples': model.training_history.get('total_samples', 0),
             'last_trained': model.training_history.get('last_trained'),
@@ -215,38 +396,35 @@ def predict():
     }
     """
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required = ['userId', 'placeId', 'userFeatures', 'placeFeatures']
-        missing = [f for f in required if f not in data]
-        if missing:
-            return jsonify({
-                'success': False,
-                'error': f'Missing required fields: {", ".join(missing)}'
-            }), 400
+        req = PredictRequest.model_validate_json(request.get_data())
+    except ValidationError as e:
+        return validation_error_response(e)
+    
+    try:
+        # Convert similar-user ratings to arrays once at the request boundary
+        similar_ratings = _to_arrays(req.similarUsersRatings)
         
         # Get prediction
         result = hybrid_prediction(
-            user_id=data['userId'],
-            place_id=data['placeId'],
-            user_features=data['userFeatures'],
-            place_features=data['placeFeatures'],
-            similar_users_ratings=data.get('similarUsersRatings', []),
-            heuristic_weight=data.get('heuristicWeight', 0.7),
-            ml_weight=data.get('mlWeight', 0.3)
+            user_id=req.userId,
+            place_id=req.placeId,
+            user_features=req.userFeatures.model_dump(),
+            place_features=req.placeFeatures.model_dump(),
+            similar_ratings=similar_ratings,
+            heuristic_weight=req.heuristicWeight,
+            ml_weight=req.mlWeight
         )
         
-        return jsonify({
+        return json_response({
             'success': True,
             'prediction': result
         })
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 @app.route('/batch-predict', methods=['POST'])
 def batch_predict():
@@ -269,55 +447,89 @@ def batch_predict():
     }
     """
     try:
-        data = request.get_json()
-        predictions_data = data.get('predictions', [])
+        req = BatchPredictRequest.model_validate_json(request.get_data())
+    except ValidationError as e:
+        return validation_error_response(e)
+    
+    try:
+        items = req.predictions
         
-        if not predictions_data:
-            return jsonify({
+        if not items:
+            return json_response({
                 'success': False,
                 'error': 'No predictions provided'
-            }), 400
+            }, 400)
         
-        results = []
-        for pred_data in predictions_data:
-            result = hybrid_prediction(
-                user_id=pred_data['userId'],
-                place_id=pred_data['placeId'],
-                user_features=pred_data['userFeatures'],
-                place_features=pred_data['placeFeatures'],
-                similar_users_ratings=pred_data.get('similarUsersRatings', []),
-                heuristic_weight=data.get('heuristicWeight', 0.7),
-                ml_weight=data.get('mlWeight', 0.3)
+        user_features_list = [item.userFeatures.model_dump() for item in items]
+        place_features_list = [item.placeFeatures.model_dump() for item in items]
+        
+        # Convert each pair's similar-user ratings to arrays once
+        similar_ratings_list = [
+            _to_arrays(item.similarUsersRatings)
+            for item in items
+        ]
+        
+        # Heuristic scores are cheap and computed per pair
+        heuristic_scores = [
+            heuristic_prediction(user_features, place_features, similar_ratings)
+            for user_features, place_features, similar_ratings in zip(
+                user_features_list, place_features_list, similar_ratings_list
             )
-            
-            results.append({
-                'userId': pred_data['userId'],
-                'placeId': pred_data['placeId'],
+        ]
+        
+        # ML scores come from one batched forward pass
+        ml_scores, ml_confidences = batch_ml_prediction(
+            [item.userId for item in items],
+            [item.placeId for item in items],
+            user_features_list,
+            place_features_list
+        )
+        
+        predictions = [
+            combine_predictions(
+                heuristic_score,
+                similar_ratings[0].size,
+                ml_score,
+                ml_confidence,
+                req.heuristicWeight,
+                req.mlWeight
+            )
+            for similar_ratings, heuristic_score, ml_score, ml_confidence in zip(
+                similar_ratings_list, heuristic_scores, ml_scores, ml_confidences
+            )
+        ]
+        
+        results = [
+            {
+                'userId': item.userId,
+                'placeId': item.placeId,
                 'prediction': result
-            })
+            }
+            for item, result in zip(items, predictions)
+        ]
         
-        return jsonify({
+        return json_response({
             'success': True,
             'predictions': results,
             'count': len(results)
         })
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
 
 @app.route('/model/info', methods=['GET'])
 def model_info():
     """Get information about the current model."""
-    if model.interaction_model is None:
-        return jsonify({
+    if not model.is_ready:
+        return json_response({
             'success': False,
             'error': 'No model loaded'
-        }), 404
+        }, 404)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'model': {
             'trained': True,
@@ -335,6 +547,7 @@ def model_info():
     })
 
 if __name__ == '__main__':
+    # Development server only - production runs under gunicorn (see gunicorn.conf.py)
     port = int(os.getenv('ML_API_PORT', 5000))
     debug = os.getenv('FLASK_ENV') == 'development'
     
@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for the Senergy ML API.
+
+Run from senergy-ml/:
+    gunicorn -c gunicorn.conf.py api:app
+"""
+
+import multiprocessing
+import os
+
+# One TF/BLAS thread per worker so worker count matches cores with no oversubscription
+os.environ.setdefault('TF_NUM_INTEROP_THREADS', '1')
+os.environ.setdefault('TF_NUM_INTRAOP_THREADS', '1')
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+bind = f"0.0.0.0:{os.getenv('ML_API_PORT', 5000)}"
+
+workers = max(2, multiprocessing.cpu_count())
+
+# Threaded workers overlap request I/O and JSON parsing with model compute.
+# gevent is avoided: its monkey-patching doesn't cooperate with TensorFlow's
+# native thread pools.
+worker_class = 'gthread'
+threads = 4
+
+# TensorFlow isn't fork-safe once its runtime is up, so each worker loads
+# its own copy of the (small) model instead of inheriting it from the master.
+preload_app = False
+
+timeout = 60
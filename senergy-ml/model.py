@@ -4,15 +4,91 @@ Uses collaborative filtering with a two-tower neural network to predict place ra
 based on user personality and historical ratings.
 """
 
+import os
+
+# CPU tuning, applied before TensorFlow initializes. The towers are tiny
+# (32x64 GEMMs), so a few intra-op threads beat the default of one per core,
+# which mostly thrashes cache. setdefault leaves anything the process was
+# started with alone (gunicorn.conf.py pins one thread per worker).
+# ONEDNN_MAX_CPU_ISA is deliberately left unset: it only caps the ISA, and
+# oneDNN already dispatches to AMX BF16 tiles on Sapphire/Granite Rapids.
+os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '1')
+os.environ.setdefault('TF_NUM_INTRAOP_THREADS', '4')
+os.environ.setdefault('TF_NUM_INTEROP_THREADS', '2')
+
 import numpy as np
 import tensorflow as tf
 from tensorflow import keras
 from sklearn.preprocessing import StandardScaler
 import joblib
-import json
-import os
+import orjson
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
+from _kernels import _aggregate_ratings
+
+# pandas is optional - without it prepare_features uses the Numba aggregation
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    tf.config.threading.set_intra_op_parallelism_threads(int(os.environ['TF_NUM_INTRAOP_THREADS']))
+    tf.config.threading.set_inter_op_parallelism_threads(int(os.environ['TF_NUM_INTEROP_THREADS']))
+except RuntimeError:
+    # The TF runtime was already initialized by an earlier import; keep its pools
+    pass
+
+# Personality type encoding
+PERSONALITY_MAP = {
+    'Strong Introvert': -1.0,
+    'Moderate Introvert': -0.5,
+    'Ambivert': 0.0,
+    'Moderate Extrovert': 0.5,
+    'Strong Extrovert': 1.0,
+    'Unknown': 0.0
+}
+
+# Personality encoding as a lookup table indexed by pd.Categorical codes;
+# the trailing 0.0 catches unmapped types (code -1)
+PERSONALITY_LUT = np.array(list(PERSONALITY_MAP.values()) + [0.0], dtype=np.float32)
+PERSONALITY_CODES = {ptype: code for code, ptype in enumerate(PERSONALITY_MAP)}
+
+# Place score feature keys, in encoded column order
+PLACE_SCORE_KEYS = [
+    'avgScore', 'avgCrowdSize', 'avgNoiseLevel', 'avgSocialEnergy', 'avgService', 'avgAtmosphere'
+]
+
+# Rating category keys, in place feature order
+CATEGORY_KEYS = ['crowdSize', 'noiseLevel', 'socialEnergy', 'service', 'atmosphere']
+
+def _bf16_supported() -> bool:
+    """Whether this host has native bfloat16 matmuls (Ampere+ GPU or AVX512-BF16/AMX CPU)."""
+    for gpu in tf.config.list_physical_devices('GPU'):
+        compute_capability = tf.config.experimental.get_device_details(gpu).get('compute_capability')
+        if compute_capability and compute_capability >= (8, 0):
+            return True
+    
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            cpu_flags = f.read()
+    except OSError:
+        return False
+    
+    return 'avx512_bf16' in cpu_flags or 'amx_bf16' in cpu_flags
+
+def _xla_enabled(use_bf16: bool) -> bool:
+    """
+    Whether to XLA-compile the model's train and inference steps.
+    
+    XLA fuses each tower's small ops into a few kernels, but its CPU backend
+    doesn't use oneDNN's bf16/AMX kernels, so bf16 on CPU skips it.
+    """
+    return not use_bf16 or bool(tf.config.list_physical_devices('GPU'))
+
+def _skip_missing_val_loss_warning(record) -> bool:
+    """Logging filter dropping the callbacks' "val_loss not available" warnings."""
+    return '`val_loss` which is not available' not in record.getMessage()
 
 class SenergyRecommendationModel:
     def __init__(self, model_dir: str = 'models'):
@@ -30,21 +106,52 @@ class SenergyRecommendationModel:
         self.place_model = None
         self.interaction_model = None
         
+        # Traced inference function, built lazily from interaction_model
+        # or restored from the exported inference SavedModel
+        self._predict_fn = None
+        self._predict_specs = None
+        self._inference_module = None
+        
+        # XLA gate shared by training and the traced inference function
+        self._jit_compile = True
+        
         # Scalers for feature normalization
         self.user_scaler = StandardScaler()
         self.place_scaler = StandardScaler()
         
+        # Fitted scaler parameters as float32 vectors for the inference path
+        self._user_mean = None
+        self._user_inv_scale = None
+        self._place_mean = None
+        self._place_inv_scale = None
+        
+        # Scaled training feature rows, indexed by user_id_map/place_id_map
+        self._user_feat_table = None
+        self._place_feat_table = None
+        
         # Feature mappings
         self.user_id_map = {}
         self.place_id_map = {}
         
-        # Training metadata
+        # Frozen ID sets for O(1) membership checks on the prediction path
+        self.user_id_set = frozenset()
+        self.place_id_set = frozenset()
+        
+        # Sorted ID keys + parallel indices for vectorized batch lookups
+        self._user_keys = np.array([], dtype=str)
+        self._user_values = np.array([], dtype=np.int32)
+        self._place_keys = np.array([], dtype=str)
+        self._place_values = np.array([], dtype=np.int32)
+        
+        # Training metadata - per-epoch losses are float32 arrays, saved to
+        # history.npz; only the scalars go in training_history.json.
+        # val_loss_history is NaN for epochs that skipped validation
         self.training_history = {
             'total_samples': 0,
             'last_trained': None,
             'epochs_completed': 0,
-            'loss_history': [],
-            'val_loss_history': []
+            'loss_history': np.array([], dtype=np.float32),
+            'val_loss_history': np.array([], dtype=np.float32)
         }
         
         # Model hyperparameters
@@ -53,6 +160,9 @@ class SenergyRecommendationModel:
         self.dropout_rate = 0.3
         self.learning_rate = 0.001
         
+        # Train in mixed bfloat16 where the hardware supports it natively
+        self.mixed_precision = True
+        
     def build_model(self, n_users: int, n_places: int, user_features_dim: int, place_features_dim: int):
         """
         Build the neural network architecture for recommendations.
@@ -63,64 +173,91 @@ class SenergyRecommendationModel:
         - Place Tower: Place embedding + aggregated rating features
         - Interaction Tower: Combines both towers with deep layers
         """
+        # bf16 doubles dense matmul throughput on hosts with native support;
+        # the output layer stays float32 so no loss scaling is needed
+        use_bf16 = self.mixed_precision and _bf16_supported()
+        previous_policy = keras.mixed_precision.global_policy()
+        if use_bf16:
+            keras.mixed_precision.set_global_policy('mixed_bfloat16')
         
+        try:
+            model = self._build_network(n_users, n_places, user_features_dim, place_features_dim)
+        finally:
+            # The policy is process-wide; models built or loaded later must not inherit it
+            keras.mixed_precision.set_global_policy(previous_policy)
+        
+        self._jit_compile = _xla_enabled(use_bf16)
+        
+        # Compile with custom loss and metrics
+        model.compile(
+            optimizer=keras.optimizers.Adam(learning_rate=self.learning_rate),
+            loss='mse',  # Mean Squared Error for rating prediction
+            metrics=[
+                'mae',  # Mean Absolute Error
+                keras.metrics.RootMeanSquaredError(name='rmse')
+            ],
+            jit_compile=self._jit_compile
+        )
+        
+        return model
+    
+    def _build_network(self, n_users: int, n_places: int, user_features_dim: int, place_features_dim: int) -> keras.Model:
+        """Wire up the tower layers under the current global dtype policy."""
         # ===== User Tower =====
-        user_id_input = keras.Input(shape=(1,), name='user_id')
+        user_id_input = keras.Input(shape=(), dtype=tf.int32, name='user_id')
         user_features_input = keras.Input(shape=(user_features_dim,), name='user_features')
         
-        # User embedding
+        # User embedding - scalar int32 IDs give (batch, embedding_dim) directly
         user_embedding = keras.layers.Embedding(
             input_dim=n_users,
             output_dim=self.embedding_dim,
             embeddings_regularizer=keras.regularizers.l2(1e-6),
             name='user_embedding'
         )(user_id_input)
-        user_embedding = keras.layers.Flatten()(user_embedding)
         
         # Combine user embedding with features
         user_concat = keras.layers.Concatenate()([user_embedding, user_features_input])
         
         # User tower deep layers
-        user_dense = keras.layers.Dense(64, activation='relu')(user_concat)
-        user_dense = keras.layers.BatchNormalization()(user_dense)
-        user_dense = keras.layers.Dropout(self.dropout_rate)(user_dense)
-        user_output = keras.layers.Dense(32, activation='relu', name='user_tower')(user_dense)
+        user_dense = keras.layers.Dense(64, activation='gelu')(user_concat)
+        user_output = keras.layers.Dense(32, activation='gelu', name='user_tower')(user_dense)
         
         # ===== Place Tower =====
-        place_id_input = keras.Input(shape=(1,), name='place_id')
+        place_id_input = keras.Input(shape=(), dtype=tf.int32, name='place_id')
         place_features_input = keras.Input(shape=(place_features_dim,), name='place_features')
         
-        # Place embedding
+        # Place embedding - scalar int32 IDs give (batch, embedding_dim) directly
         place_embedding = keras.layers.Embedding(
             input_dim=n_places,
             output_dim=self.embedding_dim,
             embeddings_regularizer=keras.regularizers.l2(1e-6),
             name='place_embedding'
         )(place_id_input)
-        place_embedding = keras.layers.Flatten()(place_embedding)
         
         # Combine place embedding with features
         place_concat = keras.layers.Concatenate()([place_embedding, place_features_input])
         
         # Place tower deep layers
-        place_dense = keras.layers.Dense(64, activation='relu')(place_concat)
-        place_dense = keras.layers.BatchNormalization()(place_dense)
-        place_dense = keras.layers.Dropout(self.dropout_rate)(place_dense)
-        place_output = keras.layers.Dense(32, activation='relu', name='place_tower')(place_dense)
+        place_dense = keras.layers.Dense(64, activation='gelu')(place_concat)
+        place_output = keras.layers.Dense(32, activation='gelu', name='place_tower')(place_dense)
         
         # ===== Interaction Tower =====
         # Combine user and place representations
         combined = keras.layers.Concatenate()([user_output, place_output])
+        # Towers are too small to need their own regularization - drop out once here
+        combined = keras.layers.Dropout(self.dropout_rate)(combined)
         
         # Deep interaction layers
         x = combined
         for units in self.hidden_units:
             x = keras.layers.Dense(units, activation='relu')(x)
-            x = keras.layers.BatchNormalization()(x)
+            x = keras.layers.LayerNormalization()(x)
             x = keras.layers.Dropout(self.dropout_rate)(x)
         
         # Output layer - predict rating (1-10)
-        output = keras.layers.Dense(1, activation='linear', name='rating_prediction')(x)
+        output = keras.layers.Dense(
+            1, activation='linear', dtype='float32', name='rating_prediction'
+        )(x)
         
         # Create model
         model = keras.Model(
@@ -129,16 +266,6 @@ class SenergyRecommendationModel:
             name='senergy_recommendation_model'
         )
         
-        # Compile with custom loss and metrics
-        model.compile(
-            optimizer=keras.optimizers.Adam(learning_rate=self.learning_rate),
-            loss='mse',  # Mean Squared Error for rating prediction
-            metrics=[
-                'mae',  # Mean Absolute Error
-                keras.metrics.RootMeanSquaredError(name='rmse')
-            ]
-        )
-        
         return model
     
     def prepare_features(self, ratings_data: List[Dict]) -> Tuple[Dict, Dict]:
@@ -151,70 +278,120 @@ class SenergyRecommendationModel:
         Returns:
             Tuple of (user_features_dict, place_features_dict)
         """
-        user_features = {}
-        place_features = {}
+        if pd is None:
+            return self._prepare_features_numba(ratings_data)
+        
+        df = pd.DataFrame(ratings_data).reindex(columns=[
+            'userId', 'placeId', 'overallScore', 'userAdjustmentFactor',
+            'userPersonalityType', 'categories'
+        ])
+        df = df.fillna({'userAdjustmentFactor': 0, 'userPersonalityType': 'Unknown'})
         
         # Extract user features
-        for rating in ratings_data:
-            user_id = rating['userId']
-            if user_id not in user_features:
-                user_features[user_id] = {
-                    'adjustmentFactor': rating.get('userAdjustmentFactor', 0),
-                    'personalityType': rating.get('userPersonalityType', 'Unknown'),
-                    'totalRatings': 0,
-                    'avgRating': 0,
-                    'ratings_sum': 0
-                }
-            
-            user_features[user_id]['totalRatings'] += 1
-            user_features[user_id]['ratings_sum'] += rating['overallScore']
-        
-        # Calculate average ratings
-        for user_id in user_features:
-            total = user_features[user_id]['totalRatings']
-            user_features[user_id]['avgRating'] = user_features[user_id]['ratings_sum'] / total
-        
-        # Extract place features
-        for rating in ratings_data:
-            place_id = rating['placeId']
-            if place_id not in place_features:
-                place_features[place_id] = {
-                    'totalRatings': 0,
-                    'avgScore': 0,
-                    'avgCrowdSize': 0,
-                    'avgNoiseLevel': 0,
-                    'avgSocialEnergy': 0,
-                    'avgService': 0,
-                    'avgAtmosphere': 0,
-                    'ratings_sum': 0,
-                    'crowd_sum': 0,
-                    'noise_sum': 0,
-                    'social_sum': 0,
-                    'service_sum': 0,
-                    'atmosphere_sum': 0
-                }
-            
-            pf = place_features[place_id]
-            pf['totalRatings'] += 1
-            pf['ratings_sum'] += rating['overallScore']
+        user_agg = df.groupby('userId', sort=False).agg(
+            adjustmentFactor=('userAdjustmentFactor', 'first'),
+            personalityType=('userPersonalityType', 'first'),
+            totalRatings=('overallScore', 'size'),
+            avgRating=('overallScore', 'mean'),
+            ratings_sum=('overallScore', 'sum')
+        )
+        
+        # Extract place features - missing category scores default to 5
+        cats = pd.json_normalize([
+            c if isinstance(c, dict) else {} for c in df['categories']
+        ]).reindex(columns=CATEGORY_KEYS).fillna(5)
+        cats.index = df.index
+        place_df = pd.concat([df[['placeId', 'overallScore']], cats], axis=1)
+        
+        place_agg = place_df.groupby('placeId', sort=False).agg(
+            totalRatings=('overallScore', 'size'),
+            avgScore=('overallScore', 'mean'),
+            avgCrowdSize=('crowdSize', 'mean'),
+            avgNoiseLevel=('noiseLevel', 'mean'),
+            avgSocialEnergy=('socialEnergy', 'mean'),
+            avgService=('service', 'mean'),
+            avgAtmosphere=('atmosphere', 'mean'),
+            ratings_sum=('overallScore', 'sum'),
+            crowd_sum=('crowdSize', 'sum'),
+            noise_sum=('noiseLevel', 'sum'),
+            social_sum=('socialEnergy', 'sum'),
+            service_sum=('service', 'sum'),
+            atmosphere_sum=('atmosphere', 'sum')
+        )
+        
+        return user_agg.to_dict('index'), place_agg.to_dict('index')
+    
+    def _prepare_features_numba(self, ratings_data: List[Dict]) -> Tuple[Dict, Dict]:
+        """
+        prepare_features without pandas: one Python pass maps IDs to dense
+        indices and packs the numeric fields, then a Numba kernel does the sums.
+        
+        Returns:
+            Tuple of (user_features_dict, place_features_dict), same layout as prepare_features
+        """
+        n = len(ratings_data)
+        user_index: Dict[str, int] = {}
+        place_index: Dict[str, int] = {}
+        user_first: List[Dict] = []
+        user_idx = np.empty(n, dtype=np.int64)
+        place_idx = np.empty(n, dtype=np.int64)
+        cats = np.empty((n, len(CATEGORY_KEYS)), dtype=np.float64)
+        
+        for i, rating in enumerate(ratings_data):
+            uid = rating['userId']
+            if uid not in user_index:
+                user_index[uid] = len(user_index)
+                user_first.append(rating)
+            user_idx[i] = user_index[uid]
+            place_idx[i] = place_index.setdefault(rating['placeId'], len(place_index))
             
-            categories = rating.get('categories', {})
-            pf['crowd_sum'] += categories.get('crowdSize', 5)
-            pf['noise_sum'] += categories.get('noiseLevel', 5)
-            pf['social_sum'] += categories.get('socialEnergy', 5)
-            pf['service_sum'] += categories.get('service', 5)
-            pf['atmosphere_sum'] += categories.get('atmosphere', 5)
-        
-        # Calculate averages for places
-        for place_id in place_features:
-            pf = place_features[place_id]
-            total = pf['totalRatings']
-            pf['avgScore'] = pf['ratings_sum'] / total
-            pf['avgCrowdSize'] = pf['crowd_sum'] / total
-            pf['avgNoiseLevel'] = pf['noise_sum'] / total
-            pf['avgSocialEnergy'] = pf['social_sum'] / total
-            pf['avgService'] = pf['service_sum'] / total
-            pf['avgAtmosphere'] = pf['atmosphere_sum'] / total
+            # Missing category scores default to 5
+            categories = rating.get('categories')
+            if not isinstance(categories, dict):
+                categories = {}
+            for j, key in enumerate(CATEGORY_KEYS):
+                value = categories.get(key)
+                cats[i, j] = 5 if value is None else value
+        
+        scores = np.fromiter((r['overallScore'] for r in ratings_data), dtype=np.float64, count=n)
+        
+        user_count, user_sum, place_count, place_sum, cat_sums = _aggregate_ratings(
+            user_idx, place_idx, scores, cats, len(user_index), len(place_index)
+        )
+        
+        user_features = {}
+        for uid, u in user_index.items():
+            first = user_first[u]
+            af = first.get('userAdjustmentFactor')
+            ptype = first.get('userPersonalityType')
+            user_features[uid] = {
+                'adjustmentFactor': 0 if af is None else af,
+                'personalityType': 'Unknown' if ptype is None else ptype,
+                'totalRatings': int(user_count[u]),
+                'avgRating': float(user_sum[u] / user_count[u]),
+                'ratings_sum': float(user_sum[u])
+            }
+        
+        place_means = cat_sums / place_count[:, None]
+        place_features = {}
+        for pid, p in place_index.items():
+            crowd, noise, social, service, atmosphere = place_means[p].tolist()
+            crowd_sum, noise_sum, social_sum, service_sum, atmosphere_sum = cat_sums[p].tolist()
+            place_features[pid] = {
+                'totalRatings': int(place_count[p]),
+                'avgScore': float(place_sum[p] / place_count[p]),
+                'avgCrowdSize': crowd,
+                'avgNoiseLevel': noise,
+                'avgSocialEnergy': social,
+                'avgService': service,
+                'avgAtmosphere': atmosphere,
+                'ratings_sum': float(place_sum[p]),
+                'crowd_sum': crowd_sum,
+                'noise_sum': noise_sum,
+                'social_sum': social_sum,
+                'service_sum': service_sum,
+                'atmosphere_sum': atmosphere_sum
+            }
         
         return user_features, place_features
     
@@ -223,46 +400,43 @@ class SenergyRecommendationModel:
         Convert feature dictionaries to numerical arrays.
         
         Returns:
-            Tuple of (user_feature_array, place_feature_array)
+            Tuple of float32 (user_feature_array, place_feature_array)
         """
-        # Personality type encoding
-        personality_map = {
-            'Strong Introvert': -1.0,
-            'Moderate Introvert': -0.5,
-            'Ambivert': 0.0,
-            'Moderate Extrovert': 0.5,
-            'Strong Extrovert': 1.0,
-            'Unknown': 0.0
-        }
+        user_rows = list(user_features.values())
+        place_rows = list(place_features.values())
+        n_users = len(user_rows)
+        n_places = len(place_rows)
+        
+        def column(rows, key, count):
+            return np.fromiter((row[key] for row in rows), dtype=np.float32, count=count)
         
         # User features: [adjustmentFactor, personality_encoded, totalRatings, avgRating]
-        user_array = np.array([
-            [
-                uf['adjustmentFactor'],
-                personality_map.get(uf['personalityType'], 0.0),
-                np.log1p(uf['totalRatings']),  # Log transform for count
-                uf['avgRating'] / 10.0  # Normalize to 0-1
-            ]
-            for uf in user_features.values()
-        ])
+        user_array = np.empty((n_users, 4), dtype=np.float32)
+        user_array[:, 0] = column(user_rows, 'adjustmentFactor', n_users)
+        if pd is not None:
+            personality_codes = pd.Categorical(
+                [uf['personalityType'] for uf in user_rows],
+                categories=list(PERSONALITY_MAP)
+            ).codes
+        else:
+            personality_codes = np.fromiter(
+                (PERSONALITY_CODES.get(uf['personalityType'], -1) for uf in user_rows),
+                dtype=np.int64,
+                count=n_users
+            )
+        user_array[:, 1] = PERSONALITY_LUT[personality_codes]
+        user_array[:, 2] = np.log1p(column(user_rows, 'totalRatings', n_users))  # Log transform for count
+        user_array[:, 3] = column(user_rows, 'avgRating', n_users) / 10.0  # Normalize to 0-1
         
         # Place features: [avgScore, avgCrowdSize, avgNoiseLevel, avgSocialEnergy, avgService, avgAtmosphere, totalRatings]
-        place_array = np.array([
-            [
-                pf['avgScore'] / 10.0,
-                pf['avgCrowdSize'] / 10.0,
-                pf['avgNoiseLevel'] / 10.0,
-                pf['avgSocialEnergy'] / 10.0,
-                pf['avgService'] / 10.0,
-                pf['avgAtmosphere'] / 10.0,
-                np.log1p(pf['totalRatings'])
-            ]
-            for pf in place_features.values()
-        ])
+        place_array = np.empty((n_places, 7), dtype=np.float32)
+        for col, key in enumerate(PLACE_SCORE_KEYS):
+            place_array[:, col] = column(place_rows, key, n_places) / 10.0
+        place_array[:, 6] = np.log1p(column(place_rows, 'totalRatings', n_places))
         
         return user_array, place_array
     
-    def train(self, ratings_data: List[Dict], epochs: int = 50, batch_size: int = 32, validation_split: float = 0.2):
+    def train(self, ratings_data: List[Dict], epochs: int = 50, batch_size: int = 256, validation_split: float = 0.2):
         """
         Train the model on rating data.
         
@@ -270,7 +444,7 @@ class SenergyRecommendationModel:
             ratings_data: List of rating dictionaries
             epochs: Number of training epochs
             batch_size: Batch size for training
-            validation_split: Fraction of data to use for validation
+            validation_split: Fraction of data (taken from the end, as Keras does) to use for validation
         """
         print(f"🤖 Training model on {len(ratings_data)} ratings...")
         
@@ -280,6 +454,7 @@ class SenergyRecommendationModel:
         # Create ID mappings
         self.user_id_map = {uid: idx for idx, uid in enumerate(user_features_dict.keys())}
         self.place_id_map = {pid: idx for idx, pid in enumerate(place_features_dict.keys())}
+        self._refresh_id_lookups()
         
         # Encode features
         user_features_array, place_features_array = self.encode_features(
@@ -289,40 +464,43 @@ class SenergyRecommendationModel:
         # Fit scalers
         self.user_scaler.fit(user_features_array)
         self.place_scaler.fit(place_features_array)
+        self._refresh_scaling()
         
         # Transform features
         user_features_scaled = self.user_scaler.transform(user_features_array)
         place_features_scaled = self.place_scaler.transform(place_features_array)
         
-        # Prepare training data
-        user_ids = []
-        user_features_list = []
-        place_ids = []
-        place_features_list = []
-        ratings = []
+        # Keep the scaled rows so inference for known users/places skips the scaler
+        self._user_feat_table = user_features_scaled.astype(np.float32)
+        self._place_feat_table = place_features_scaled.astype(np.float32)
         
-        for rating in ratings_data:
-            user_id = rating['userId']
-            place_id = rating['placeId']
-            
-            if user_id in self.user_id_map and place_id in self.place_id_map:
-                user_idx = self.user_id_map[user_id]
-                place_idx = self.place_id_map[place_id]
-                
-                user_ids.append(user_idx)
-                user_features_list.append(user_features_scaled[user_idx])
-                place_ids.append(place_idx)
-                place_features_list.append(place_features_scaled[place_idx])
-                ratings.append(rating['overallScore'])
-        
-        # Convert to numpy arrays
+        # Prepare training data - drop ratings whose user/place has no mapping
+        user_ids = np.fromiter(
+            (self.user_id_map.get(r['userId'], -1) for r in ratings_data),
+            dtype=np.int32,
+            count=len(ratings_data)
+        )
+        place_ids = np.fromiter(
+            (self.place_id_map.get(r['placeId'], -1) for r in ratings_data),
+            dtype=np.int32,
+            count=len(ratings_data)
+        )
+        mask = (user_ids >= 0) & (place_ids >= 0)
+        user_ids = user_ids[mask]
+        place_ids = place_ids[mask]
+        
+        # Gather per-rating feature rows with one fancy-index copy per tower
         X = {
-            'user_id': np.array(user_ids),
-            'user_features': np.array(user_features_list),
-            'place_id': np.array(place_ids),
-            'place_features': np.array(place_features_list)
+            'user_id': user_ids,
+            'user_features': user_features_scaled[user_ids],
+            'place_id': place_ids,
+            'place_features': place_features_scaled[place_ids]
         }
-        y = np.array(ratings)
+        y = np.fromiter(
+            (r['overallScore'] for r in ratings_data),
+            dtype=np.float32,
+            count=len(ratings_data)
+        )[mask]
         
         # Build model if not exists
         if self.interaction_model is None:
@@ -332,43 +510,92 @@ class SenergyRecommendationModel:
                 user_features_dim=user_features_scaled.shape[1],
                 place_features_dim=place_features_scaled.shape[1]
             )
+            self._predict_fn = None
         
         print(f"📊 Model architecture:")
         self.interaction_model.summary()
         
+        # Validation runs every few epochs, so patience counts validation passes
+        validation_freq = 3
+        
         # Callbacks
         callbacks = [
             keras.callbacks.EarlyStopping(
                 monitor='val_loss',
-                patience=10,
+                patience=4,
                 restore_best_weights=True,
                 verbose=1
             ),
             keras.callbacks.ReduceLROnPlateau(
                 monitor='val_loss',
                 factor=0.5,
-                patience=5,
+                patience=2,
                 min_lr=1e-7,
                 verbose=1
             )
         ]
         
-        # Train model
-        history = self.interaction_model.fit(
-            X, y,
-            epochs=epochs,
-            batch_size=batch_size,
-            validation_split=validation_split,
-            callbacks=callbacks,
-            verbose=1
+        # Input pipeline - batches are prepared on TF's own threads and
+        # prefetched so they overlap with the training step
+        n_samples = len(y)
+        n_val = int(n_samples * validation_split)
+        n_train = n_samples - n_val
+        
+        # The partial last batch is kept: it costs XLA one extra compiled shape,
+        # where dropping it would discard up to a batch of ratings every epoch
+        dataset = tf.data.Dataset.from_tensor_slices((X, y))
+        train_ds = (
+            dataset.take(n_train)
+            .cache()
+            .shuffle(n_train, reshuffle_each_iteration=True)
+            .batch(batch_size)
+            .prefetch(tf.data.AUTOTUNE)
         )
+        val_ds = None
+        if n_val > 0:
+            val_ds = (
+                dataset.skip(n_train)
+                .batch(batch_size)
+                .cache()
+                .prefetch(tf.data.AUTOTUNE)
+            )
+        
+        # Train model - the callbacks warn on every epoch that skips validation,
+        # which is expected with validation_freq, so silence that warning
+        tf_logger = tf.get_logger()
+        tf_logger.addFilter(_skip_missing_val_loss_warning)
+        try:
+            history = self.interaction_model.fit(
+                train_ds,
+                validation_data=val_ds,
+                validation_freq=validation_freq,
+                epochs=epochs,
+                callbacks=callbacks,
+                verbose=1
+            )
+        finally:
+            tf_logger.removeFilter(_skip_missing_val_loss_warning)
+        
+        # One val_loss per validation pass; spread it over the epochs (NaN where
+        # validation was skipped) so val_loss_history lines up with loss_history
+        n_epochs = len(history.history['loss'])
+        val_loss = np.full(n_epochs, np.nan, dtype=np.float32)
+        val_epochs = np.arange(validation_freq - 1, n_epochs, validation_freq)
+        reported_val_loss = np.asarray(history.history.get('val_loss', []), dtype=np.float32)
+        val_loss[val_epochs[:len(reported_val_loss)]] = reported_val_loss[:len(val_epochs)]
         
         # Update training metadata
         self.training_history['total_samples'] += len(ratings_data)
         self.training_history['last_trained'] = datetime.now().isoformat()
-        self.training_history['epochs_completed'] += len(history.history['loss'])
-        self.training_history['loss_history'].extend(history.history['loss'])
-        self.training_history['val_loss_history'].extend(history.history.get('val_loss', []))
+        self.training_history['epochs_completed'] += n_epochs
+        self.training_history['loss_history'] = np.concatenate([
+            self.training_history['loss_history'],
+            np.asarray(history.history['loss'], dtype=np.float32)
+        ])
+        self.training_history['val_loss_history'] = np.concatenate([
+            self.training_history['val_loss_history'],
+            val_loss
+        ])
         
         print(f"✅ Training complete!")
         print(f"   Final loss: {history.history['loss'][-1]:.4f}")
@@ -392,7 +619,7 @@ class SenergyRecommendationModel:
         Returns:
             Predicted rating (1-10)
         """
-        if self.interaction_model is None:
+        if not self.is_ready:
             raise ValueError("Model not trained yet!")
         
         # Check if user/place are in training set
@@ -408,26 +635,229 @@ class SenergyRecommendationModel:
         else:
             place_idx = self.place_id_map[place_id]
         
-        # Prepare user features
-        personality_map = {
-            'Strong Introvert': -1.0,
-            'Moderate Introvert': -0.5,
-            'Ambivert': 0.0,
-            'Moderate Extrovert': 0.5,
-            'Strong Extrovert': 1.0,
-            'Unknown': 0.0
+        # Predict
+        X = {
+            'user_id': np.array([user_idx], dtype=np.int32),
+            'user_features': self._scaled_user_rows(
+                np.array([self.user_id_map.get(user_id, -1)]),
+                [user_features]
+            ),
+            'place_id': np.array([place_idx], dtype=np.int32),
+            'place_features': self._scaled_place_rows(
+                np.array([self.place_id_map.get(place_id, -1)]),
+                [place_features]
+            )
         }
         
-        user_feat_array = np.array([[
+        prediction = float(self._forward(X)[0, 0])
+        
+        # Clip to valid range
+        return 1.0 if prediction < 1.0 else (10.0 if prediction > 10.0 else prediction)
+    
+    def predict_batch(
+        self,
+        user_ids: List[str],
+        place_ids: List[str],
+        user_features_list: List[Dict],
+        place_features_list: List[Dict]
+    ) -> np.ndarray:
+        """
+        Predict ratings for many user-place pairs in a single forward pass.
+        
+        Args:
+            user_ids: User IDs
+            place_ids: Place IDs, aligned with user_ids
+            user_features_list: User feature dictionaries, aligned with user_ids
+            place_features_list: Place feature dictionaries, aligned with user_ids
+            
+        Returns:
+            Array of predicted ratings (1-10), one per pair
+        """
+        if not self.is_ready:
+            raise ValueError("Model not trained yet!")
+        
+        user_idx = self._lookup(user_ids, self._user_keys, self._user_values)
+        place_idx = self._lookup(place_ids, self._place_keys, self._place_values)
+        
+        # Unknown users/places use the default embedding (cold start), as in predict()
+        X = {
+            'user_id': np.maximum(user_idx, 0),
+            'user_features': self._scaled_user_rows(user_idx, user_features_list),
+            'place_id': np.maximum(place_idx, 0),
+            'place_features': self._scaled_place_rows(place_idx, place_features_list)
+        }
+        
+        predictions = self._forward(X)[:, 0]
+        
+        # Clip to valid range
+        return np.clip(predictions, 1.0, 10.0)
+    
+    def predict_for_user(
+        self,
+        user_id: str,
+        place_ids: List[str],
+        user_features: Dict,
+        place_features_map: Dict[str, Dict]
+    ) -> np.ndarray:
+        """
+        Score many candidate places for one user in a single forward pass.
+        
+        Args:
+            user_id: User ID
+            place_ids: Candidate place IDs
+            user_features: User feature dictionary
+            place_features_map: Place feature dictionaries keyed by place ID
+            
+        Returns:
+            Array of predicted ratings (1-10), aligned with place_ids
+        """
+        if not self.is_ready:
+            raise ValueError("Model not trained yet!")
+        
+        k = len(place_ids)
+        user_idx = self.user_id_map.get(user_id, -1)
+        place_idx = self._lookup(place_ids, self._place_keys, self._place_values)
+        
+        # The user side is identical for every candidate - encode it once and broadcast
+        user_feat_scaled = self._scaled_user_rows(np.array([user_idx]), [user_features])
+        place_features_list = [place_features_map.get(pid, {}) for pid in place_ids]
+        
+        # Unknown users/places use the default embedding (cold start), as in predict()
+        X = {
+            'user_id': np.full(k, max(user_idx, 0), dtype=np.int32),
+            'user_features': np.broadcast_to(user_feat_scaled, (k, user_feat_scaled.shape[1])),
+            'place_id': np.maximum(place_idx, 0),
+            'place_features': self._scaled_place_rows(place_idx, place_features_list)
+        }
+        
+        # Clip to valid range
+        return np.clip(self._forward(X)[:, 0], 1.0, 10.0)
+    
+    @property
+    def is_ready(self) -> bool:
+        """Whether a trained model is available for prediction."""
+        return self.interaction_model is not None or self._predict_fn is not None
+    
+    def _model_input_specs(self) -> Dict[str, tf.TensorSpec]:
+        """TensorSpecs for the model's named inputs, taken from the model itself."""
+        return {
+            name: tf.TensorSpec(shape=tensor.shape, dtype=tensor.dtype, name=name)
+            for name, tensor in zip(self.interaction_model.input_names, self.interaction_model.inputs)
+        }
+    
+    def _build_predict_fn(self):
+        """
+        Trace the inference forward pass once and return its concrete function.
+        
+        The input signature comes from the model's own inputs, so models saved
+        with older input shapes still load. XLA, gated like training by
+        _jit_compile, fuses the dense + activation kernels, and calling the concrete function directly skips tf.function's
+        per-call signature matching and retracing checks. The same function is
+        exported as the SavedModel's serving signature, so its output is a dict.
+        """
+        interaction_model = self.interaction_model
+        self._predict_specs = self._model_input_specs()
+        
+        @tf.function(
+            input_signature=[self._predict_specs],
+            jit_compile=self._jit_compile,
+            reduce_retracing=True
+        )
+        def predict_fn(inputs):
+            return {'rating_prediction': interaction_model(inputs, training=False)}
+        
+        return predict_fn.get_concrete_function()
+    
+    def _forward(self, X: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Run the traced inference function on a batch of model inputs.
+        
+        The batch is zero-padded up to a power of two so XLA only compiles a
+        handful of shapes; the padding rows are dropped from the output.
+        Inputs are shaped and cast in NumPy so the only TF work per call is
+        the traced graph itself.
+        """
+        if self._predict_fn is None:
+            self._predict_fn = self._build_predict_fn()
+        
+        n = len(X['user_id'])
+        padding = (1 << max(n - 1, 0).bit_length()) - n
+        
+        inputs = {}
+        for name, spec in self._predict_specs.items():
+            array = np.asarray(X[name], dtype=spec.dtype.as_numpy_dtype)
+            array = array.reshape([-1] + spec.shape[1:].as_list())
+            if padding:
+                pad_width = [(0, padding)] + [(0, 0)] * (array.ndim - 1)
+                array = np.pad(array, pad_width)
+            inputs[name] = tf.constant(array)
+        
+        return self._predict_fn(inputs)['rating_prediction'].numpy()[:n]
+    
+    def _scaled_user_rows(self, user_idx: np.ndarray, user_features_list: List[Dict]) -> np.ndarray:
+        """Scaled user feature rows for a batch of user indices (-1 = unknown)."""
+        return self._scaled_rows(
+            user_idx,
+            user_features_list,
+            self._user_feat_table,
+            self._user_feature_row,
+            self._scale_user
+        )
+    
+    def _scaled_place_rows(self, place_idx: np.ndarray, place_features_list: List[Dict]) -> np.ndarray:
+        """Scaled place feature rows for a batch of place indices (-1 = unknown)."""
+        return self._scaled_rows(
+            place_idx,
+            place_features_list,
+            self._place_feat_table,
+            self._place_feature_row,
+            self._scale_place
+        )
+    
+    def _scaled_rows(self, idx, features_list, table, row_fn, scale_fn) -> np.ndarray:
+        """
+        Scaled feature rows, reusing the cached training rows for known IDs.
+        
+        Only cold-start IDs (or models saved without a table) go through the
+        request-side features and the scaler.
+        """
+        known = idx >= 0 if table is not None else np.zeros(len(idx), dtype=bool)
+        
+        if known.all():
+            return table[idx]
+        
+        rows = scale_fn(np.array([row_fn(f) for f in features_list], dtype=np.float32))
+        if known.any():
+            rows[known] = table[idx[known]]
+        return rows
+    
+    def _scale_user(self, x: np.ndarray) -> np.ndarray:
+        """StandardScaler transform for user rows without sklearn's validation overhead."""
+        return (x - self._user_mean) * self._user_inv_scale
+    
+    def _scale_place(self, x: np.ndarray) -> np.ndarray:
+        """StandardScaler transform for place rows without sklearn's validation overhead."""
+        return (x - self._place_mean) * self._place_inv_scale
+    
+    def _refresh_scaling(self):
+        """Extract float32 mean / inverse-scale vectors from the fitted scalers."""
+        self._user_mean = self.user_scaler.mean_.astype(np.float32)
+        self._user_inv_scale = (1.0 / self.user_scaler.scale_).astype(np.float32)
+        self._place_mean = self.place_scaler.mean_.astype(np.float32)
+        self._place_inv_scale = (1.0 / self.place_scaler.scale_).astype(np.float32)
+    
+    def _user_feature_row(self, user_features: Dict) -> List[float]:
+        """Encode a request-side user feature dictionary as a model input row."""
+        return [
             user_features.get('adjustmentFactor', 0),
-            personality_map.get(user_features.get('personalityType', 'Unknown'), 0.0),
+            PERSONALITY_MAP.get(user_features.get('personalityType', 'Unknown'), 0.0),
             np.log1p(user_features.get('totalRatings', 1)),
             user_features.get('avgRating', 5.0) / 10.0
-        ]])
-        user_feat_scaled = self.user_scaler.transform(user_feat_array)
-        
-        # Prepare place features
-        place_feat_array = np.array([[
+        ]
+    
+    def _place_feature_row(self, place_features: Dict) -> List[float]:
+        """Encode a request-side place feature dictionary as a model input row."""
+        return [
             place_features.get('avgScore', 5.0) / 10.0,
             place_features.get('avgCrowdSize', 5.0) / 10.0,
             place_features.get('avgNoiseLevel', 5.0) / 10.0,
@@ -435,82 +865,181 @@ class SenergyRecommendationModel:
             place_features.get('avgService', 5.0) / 10.0,
             place_features.get('avgAtmosphere', 5.0) / 10.0,
             np.log1p(place_features.get('totalRatings', 1))
-        ]])
-        place_feat_scaled = self.place_scaler.transform(place_feat_array)
-        
-        # Predict
-        X = {
-            'user_id': np.array([user_idx]),
-            'user_features': user_feat_scaled,
-            'place_id': np.array([place_idx]),
-            'place_features': place_feat_scaled
-        }
+        ]
+    
+    def _refresh_id_lookups(self):
+        """Rebuild the frozen ID sets and sorted lookup arrays after the ID mappings change."""
+        self.user_id_set = frozenset(self.user_id_map)
+        self.place_id_set = frozenset(self.place_id_map)
+        self._user_keys, self._user_values = self._sorted_lookup(self.user_id_map)
+        self._place_keys, self._place_values = self._sorted_lookup(self.place_id_map)
+    
+    @staticmethod
+    def _sorted_lookup(id_map: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Split an ID map into sorted fixed-width string keys and their indices."""
+        keys = np.array(sorted(id_map), dtype=str)
+        values = np.fromiter((id_map[k] for k in keys.tolist()), dtype=np.int32, count=keys.size)
+        return keys, values
+    
+    @staticmethod
+    def _lookup(ids: List[str], keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Vectorized ID -> index lookup by binary search over sorted keys.
         
-        prediction = self.interaction_model.predict(X, verbose=0)[0][0]
+        Returns:
+            int32 indices aligned with ids, -1 where the ID is unknown
+        """
+        if keys.size == 0 or len(ids) == 0:
+            return np.full(len(ids), -1, dtype=np.int32)
         
-        # Clip to valid range
-        return np.clip(prediction, 1.0, 10.0)
+        query = np.asarray(ids, dtype=str)
+        pos = np.minimum(np.searchsorted(keys, query), keys.size - 1)
+        return np.where(keys[pos] == query, values[pos], -1).astype(np.int32)
     
     def save(self):
         """Save model, scalers, and metadata to disk."""
         print(f"💾 Saving model to {self.model_dir}...")
         
-        # Save Keras model
+        # Save Keras model (training checkpoint, includes optimizer state)
         if self.interaction_model is not None:
             model_path = os.path.join(self.model_dir, 'recommendation_model.keras')
             self.interaction_model.save(model_path)
+            
+            # Save inference-only SavedModel with a traced serving signature
+            self.interaction_model.save(
+                os.path.join(self.model_dir, 'inference_model'),
+                save_format='tf',
+                include_optimizer=False,
+                signatures={'serving_default': self._build_predict_fn()}
+            )
+        
+        # Save raw scaler parameters - np.load is much cheaper than unpickling.
+        # scaling.npz is the source of truth; the scaler pickles are only read
+        # for older models and never rewritten, since a loaded model's
+        # StandardScaler objects are unfitted
+        if self._user_mean is not None:
+            np.savez(
+                os.path.join(self.model_dir, 'scaling.npz'),
+                user_mean=self._user_mean,
+                user_inv_scale=self._user_inv_scale,
+                place_mean=self._place_mean,
+                place_inv_scale=self._place_inv_scale
+            )
         
-        # Save scalers
-        joblib.dump(self.user_scaler, os.path.join(self.model_dir, 'user_scaler.pkl'))
-        joblib.dump(self.place_scaler, os.path.join(self.model_dir, 'place_scaler.pkl'))
+        # Save scaled feature tables
+        if self._user_feat_table is not None:
+            np.save(os.path.join(self.model_dir, 'user_feat_table.npy'), self._user_feat_table)
+        if self._place_feat_table is not None:
+            np.save(os.path.join(self.model_dir, 'place_feat_table.npy'), self._place_feat_table)
         
         # Save ID mappings
-        with open(os.path.join(self.model_dir, 'user_id_map.json'), 'w') as f:
-            json.dump(self.user_id_map, f)
+        with open(os.path.join(self.model_dir, 'user_id_map.json'), 'wb') as f:
+            f.write(orjson.dumps(self.user_id_map))
         
-        with open(os.path.join(self.model_dir, 'place_id_map.json'), 'w') as f:
-            json.dump(self.place_id_map, f)
+        with open(os.path.join(self.model_dir, 'place_id_map.json'), 'wb') as f:
+            f.write(orjson.dumps(self.place_id_map))
+        
+        # Save training metadata - loss histories as binary arrays, scalars as JSON
+        np.savez_compressed(
+            os.path.join(self.model_dir, 'history.npz'),
+            loss=self.training_history['loss_history'],
+            val_loss=self.training_history['val_loss_history']
+        )
         
-        # Save training metadata
-        with open(os.path.join(self.model_dir, 'training_history.json'), 'w') as f:
-            json.dump(self.training_history, f, indent=2)
+        metadata = {
+            key: value for key, value in self.training_history.items()
+            if key not in ('loss_history', 'val_loss_history')
+        }
+        with open(os.path.join(self.model_dir, 'training_history.json'), 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
         
         print("✅ Model saved successfully!")
     
-    def load(self):
-        """Load model, scalers, and metadata from disk."""
+    def load(self, inference_only: bool = False):
+        """
+        Load model, scalers, and metadata from disk.
+        
+        Args:
+            inference_only: Load only the exported serving signature (when present)
+                instead of the full Keras training checkpoint
+        """
         print(f"📂 Loading model from {self.model_dir}...")
         
-        # Load Keras model
+        inference_path = os.path.join(self.model_dir, 'inference_model')
         model_path = os.path.join(self.model_dir, 'recommendation_model.keras')
-        if os.path.exists(model_path):
+        
+        if inference_only and os.path.exists(inference_path):
+            # Serve straight from the traced signature, bypassing the Keras wrapper
+            self._inference_module = tf.saved_model.load(inference_path)
+            serving_fn = self._inference_module.signatures['serving_default']
+            self._predict_specs = serving_fn.structured_input_signature[1]
+            self._predict_fn = lambda inputs: serving_fn(**inputs)
+        elif os.path.exists(model_path):
+            # Load Keras model
             self.interaction_model = keras.models.load_model(model_path)
+            self._predict_fn = None
+            self._jit_compile = _xla_enabled(any(
+                layer.compute_dtype == 'bfloat16' for layer in self.interaction_model.layers
+            ))
+        
+        # Load scaler parameters, falling back to the pickled scalers for older models
+        scaling_path = os.path.join(self.model_dir, 'scaling.npz')
+        if os.path.exists(scaling_path):
+            with np.load(scaling_path) as scaling:
+                self._user_mean = scaling['user_mean']
+                self._user_inv_scale = scaling['user_inv_scale']
+                self._place_mean = scaling['place_mean']
+                self._place_inv_scale = scaling['place_inv_scale']
+        else:
+            user_scaler_path = os.path.join(self.model_dir, 'user_scaler.pkl')
+            if os.path.exists(user_scaler_path):
+                self.user_scaler = joblib.load(user_scaler_path)
+            
+            place_scaler_path = os.path.join(self.model_dir, 'place_scaler.pkl')
+            if os.path.exists(place_scaler_path):
+                self.place_scaler = joblib.load(place_scaler_path)
+            
+            if hasattr(self.user_scaler, 'mean_') and hasattr(self.place_scaler, 'mean_'):
+                self._refresh_scaling()
         
-        # Load scalers
-        user_scaler_path = os.path.join(self.model_dir, 'user_scaler.pkl')
-        if os.path.exists(user_scaler_path):
-            self.user_scaler = joblib.load(user_scaler_path)
+        # Load scaled feature tables (memory-mapped, paged in on demand)
+        user_table_path = os.path.join(self.model_dir, 'user_feat_table.npy')
+        if os.path.exists(user_table_path):
+            self._user_feat_table = np.load(user_table_path, mmap_mode='r')
         
-        place_scaler_path = os.path.join(self.model_dir, 'place_scaler.pkl')
-        if os.path.exists(place_scaler_path):
-            self.place_scaler = joblib.load(place_scaler_path)
+        place_table_path = os.path.join(self.model_dir, 'place_feat_table.npy')
+        if os.path.exists(place_table_path):
+            self._place_feat_table = np.load(place_table_path, mmap_mode='r')
         
         # Load ID mappings
         user_map_path = os.path.join(self.model_dir, 'user_id_map.json')
         if os.path.exists(user_map_path):
-            with open(user_map_path, 'r') as f:
-                self.user_id_map = json.load(f)
+            with open(user_map_path, 'rb') as f:
+                self.user_id_map = orjson.loads(f.read())
         
         place_map_path = os.path.join(self.model_dir, 'place_id_map.json')
         if os.path.exists(place_map_path):
-            with open(place_map_path, 'r') as f:
-                self.place_id_map = json.load(f)
+            with open(place_map_path, 'rb') as f:
+                self.place_id_map = orjson.loads(f.read())
+        
+        self._refresh_id_lookups()
         
         # Load training metadata
         history_path = os.path.join(self.model_dir, 'training_history.json')
         if os.path.exists(history_path):
-            with open(history_path, 'r') as f:
-                self.training_history = json.load(f)
+            with open(history_path, 'rb') as f:
+                metadata = orjson.loads(f.read())
+            
+            # Older models kept the loss histories as JSON lists
+            for key in ('loss_history', 'val_loss_history'):
+                self.training_history[key] = np.asarray(metadata.pop(key, []), dtype=np.float32)
+            self.training_history.update(metadata)
+        
+        losses_path = os.path.join(self.model_dir, 'history.npz')
+        if os.path.exists(losses_path):
+            with np.load(losses_path) as losses:
+                self.training_history['loss_history'] = losses['loss']
+                self.training_history['val_loss_history'] = losses['val_loss']
         
         print("✅ Model loaded successfully!")
         print(f"   Total samples trained: {self.training_history['total_samples']}")
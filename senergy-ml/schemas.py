@@ -0,0 +1,86 @@
+"""
+Request and response schemas for the prediction API.
+Request bodies are parsed and validated in one pass by pydantic's compiled core;
+defaults match the fallbacks the prediction code used with dict.get(), and
+fields stay as lenient as that dict access was (null personality types,
+numeric IDs, fractional counts).
+Responses are slotted dataclasses that orjson serializes natively.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+
+class UserFeatures(BaseModel):
+    adjustmentFactor: float = 0.0
+    personalityType: Optional[str] = 'Unknown'
+    totalRatings: float = 1
+    avgRating: float = 5.0
+
+class PlaceFeatures(BaseModel):
+    avgScore: float = 5.0
+    avgCrowdSize: float = 5.0
+    avgNoiseLevel: float = 5.0
+    avgSocialEnergy: float = 5.0
+    avgService: float = 5.0
+    avgAtmosphere: float = 5.0
+    totalRatings: float = 1
+
+class SimilarUserRating(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+    
+    userId: Optional[str] = None
+    userAdjustmentFactor: float = 0.0
+    overallScore: float
+
+class PredictionItem(BaseModel):
+    """A single user-place pair to score."""
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+    
+    userId: str
+    placeId: str
+    userFeatures: UserFeatures
+    placeFeatures: PlaceFeatures
+    similarUsersRatings: List[SimilarUserRating] = []
+
+class PredictRequest(PredictionItem):
+    """Body of POST /predict."""
+    heuristicWeight: float = 0.7
+    mlWeight: float = 0.3
+
+class BatchPredictRequest(BaseModel):
+    """Body of POST /batch-predict."""
+    predictions: List[PredictionItem] = []
+    heuristicWeight: float = 0.7
+    mlWeight: float = 0.3
+
+@dataclass
+class HeuristicBreakdown:
+    __slots__ = ('score', 'confidence', 'weight', 'n_similar_users')
+    score: float
+    confidence: float
+    weight: float
+    n_similar_users: int
+
+@dataclass
+class MLBreakdown:
+    __slots__ = ('score', 'confidence', 'weight', 'available')
+    score: Optional[float]
+    confidence: Optional[float]
+    weight: float
+    available: bool
+
+@dataclass
+class PredictionBreakdown:
+    __slots__ = ('heuristic', 'ml')
+    heuristic: HeuristicBreakdown
+    ml: MLBreakdown
+
+@dataclass
+class PredictionResult:
+    """Prediction returned by /predict and each /batch-predict entry."""
+    __slots__ = ('predictedScore', 'confidence', 'method', 'breakdown')
+    predictedScore: float
+    confidence: float
+    method: str
+    breakdown: PredictionBreakdown
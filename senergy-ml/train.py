@@ -4,8 +4,16 @@ Fetches data from Firestore and trains the model.
 """
 
 import os
+
+# Same oneDNN/thread defaults as model.py; set here too so they are in
+# place before anything below can pull TensorFlow in
+os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '1')
+os.environ.setdefault('TF_NUM_INTRAOP_THREADS', '4')
+os.environ.setdefault('TF_NUM_INTEROP_THREADS', '2')
+
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import firebase_admin
 from firebase_admin import credentials, firestore
@@ -15,6 +23,9 @@ from model import SenergyRecommendationModel
 # Load environment variables
 load_dotenv()
 
+# Ratings fetched per Firestore query
+RATINGS_PAGE_SIZE = 1000
+
 def initialize_firebase():
     """Initialize Firebase Admin SDK."""
     if not firebase_admin._apps:
@@ -37,6 +48,48 @@ def initialize_firebase():
     
     return firestore.client()
 
+def _fetch_ratings_page(db, cursor, page_size: int):
+    """Fetch one page of rating documents, ordered by document ID, after cursor."""
+    query = (
+        db.collection('ratings')
+        .order_by(firestore.FieldPath.document_id())
+        .limit(page_size)
+    )
+    if cursor is not None:
+        query = query.start_after(cursor)
+    return list(query.stream())
+
+def iter_ratings(db, page_size: int = RATINGS_PAGE_SIZE):
+    """
+    Yield ratings from Firestore one page at a time.
+    
+    The next page is requested on a background thread while the current
+    one is being consumed, so network round trips overlap with processing.
+    
+    Args:
+        db: Firestore client
+        page_size: Documents per paginated query
+    
+    Yields:
+        Rating dictionaries, with the document ID under 'id'
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(_fetch_ratings_page, db, None, page_size)
+        
+        while pending is not None:
+            page = pending.result()
+            
+            # A short page is the last one; don't issue another query
+            if len(page) == page_size:
+                pending = executor.submit(_fetch_ratings_page, db, page[-1], page_size)
+            else:
+                pending = None
+            
+            for doc in page:
+                rating = doc.to_dict()
+                rating['id'] = doc.id
+                yield rating
+
 def fetch_ratings_data(db):
     """
     Fetch all ratings from Firestore.
@@ -46,14 +99,7 @@ def fetch_ratings_data(db):
     """
     print("📊 Fetching ratings from Firestore...")
     
-    ratings_ref = db.collection('ratings')
-    ratings_docs = ratings_ref.stream()
-    
-    ratings_data = []
-    for doc in ratings_docs:
-        rating = doc.to_dict()
-        rating['id'] = doc.id
-        ratings_data.append(rating)
+    ratings_data = list(iter_ratings(db))
     
     print(f"✅ Fetched {len(ratings_data)} ratings")
     return ratings_data
@@ -135,7 +181,7 @@ def main():
         history = model.train(
             ratings_data=ratings_data,
             epochs=100,  # Max epochs (early stopping will reduce this)
-            batch_size=32,
+            batch_size=256,
             validation_split=0.2
         )
         